@@ -2,47 +2,216 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import re
+import sys
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+
+class FellowEntry(NamedTuple):
+    """One fellow's precomputed matching data (see _build_fellow_index)."""
+
+    fellow_lower: str  # normalized fellow name
+    parts_fellow: FrozenSet[str]  # its name tokens
+    alias_exact: FrozenSet[str]  # aliases for equality probes
+    alias_substrs: Tuple[str, ...]  # aliases for substring tests, shortest first
+
+
+# (normalized alias -> fellows, fellow name tokens -> fellows)
+LookupIndex = Tuple[Dict[str, Tuple[str, ...]], Dict[FrozenSet[str], Tuple[str, ...]]]
+
+# Sentinel for "fellow not matched" in a single dict lookup
+_MISSING = object()
+
+# Report status values, shared by every row
+_PRESENT = sys.intern("present")
+_ABSENT = sys.intern("absent")
 
 
 def _normalize_name(s: str) -> str:
     """Lowercase and collapse spaces for comparison."""
-    return " ".join(s.lower().split())
+    stripped = s.lower().strip()
+    # Fast path: no double spaces and no whitespace other than " " (tabs, newlines and
+    # Unicode spaces are all non-printable), so split/join would return it unchanged
+    if "  " not in stripped and stripped.isprintable():
+        return stripped
+    return " ".join(stripped.split())
+
+
+def _contains_name(haystack: str, name: str) -> bool:
+    """
+    True if name occurs in haystack without a letter directly before or after it, so
+    "allison li" is not found in "allison lin" but "jerry liu" is in "dr.jerry liu-26".
+    """
+    start = haystack.find(name)
+    while start != -1:
+        end = start + len(name)
+        if not (start and haystack[start - 1].isalpha()) and not (
+            end < len(haystack) and haystack[end].isalpha()
+        ):
+            return True
+        start = haystack.find(name, start + 1)
+    return False
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion or substitution."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    for i, (ca, cb) in enumerate(zip(a, b)):
+        if ca != cb:
+            if len(a) == len(b):
+                return a[i + 1:] == b[i + 1:]
+            return a[i:] == b[i + 1:]
+    return True
+
+
+def _is_given_name_typo(fellow_lower: str, dn_lower: str) -> bool:
+    """
+    True if dn_lower is fellow_lower with a typo in the given name(s): the surname (last token)
+    must appear exactly, and each given name must be one edit from a distinct remaining token.
+    "Jery Liu" and "Liu, Jery" match Jerry Liu; "Olivia Liu" does not match Olivia Lu.
+    """
+    if not fellow_lower or not dn_lower:
+        return False
+    # Cheap reject before any splitting: most senders don't contain the surname at all
+    if fellow_lower.rpartition(" ")[2] not in dn_lower:
+        return False
+    *given, surname = fellow_lower.split()
+    dn_tokens = dn_lower.replace(",", " ").split()
+    if not given or surname not in dn_tokens:
+        return False
+    dn_tokens.remove(surname)
+    if len(dn_tokens) != len(given):
+        return False
+    for name in given:
+        for token in dn_tokens:
+            if _within_one_edit(name, token):
+                dn_tokens.remove(token)
+                break
+        else:
+            return False
+    return True
+
+
+def _alias_regex(
+    alias_substrs: Tuple[str, ...],
+    regex_cache: Dict[Tuple[str, ...], Pattern[str]],
+) -> Pattern[str]:
+    """
+    Compiled alternation of a fellow's aliases, built the first time it is searched and
+    kept in regex_cache (one dict per mark_present call, so nothing outlives the run).
+    """
+    regex = regex_cache.get(alias_substrs)
+    if regex is None:
+        regex = regex_cache[alias_substrs] = re.compile("|".join(map(re.escape, alias_substrs)))
+    return regex
+
+
+def _build_fellow_index(
+    fellows_map: Dict[str, List[str]],
+    fellows: Optional[Iterable[str]] = None,
+) -> Dict[str, FellowEntry]:
+    """
+    Normalize each of fellows (default: every fellow in fellows_map; schedule names without
+    a fellows.yaml entry are fine) once, so matching does no per-sender lowercasing.
+    Empty aliases are dropped. Names, tokens and aliases are interned since the same
+    few strings are hashed and compared for every sender.
+    """
+    index: Dict[str, FellowEntry] = {}
+    for fellow in fellows_map if fellows is None else fellows:
+        if fellow in index:
+            continue
+        fellow = sys.intern(fellow)
+        fellow_lower = sys.intern(_normalize_name(fellow))
+        aliases_lower = [sys.intern(a.strip().lower()) for a in fellows_map.get(fellow, ())]
+        # Shortest first, so alias_substrs[0] bounds the haystack length worth searching.
+        # An alias containing a shorter one is redundant: the shorter one matches wherever it does.
+        alias_substrs: Tuple[str, ...] = ()
+        if len(aliases_lower) == 1:
+            alias_substrs = (aliases_lower[0],) if aliases_lower[0] else ()
+        else:
+            for alias in sorted(dict.fromkeys(a for a in aliases_lower if a), key=len):
+                if not any(shorter in alias for shorter in alias_substrs):
+                    alias_substrs += (alias,)
+        index[fellow] = FellowEntry(
+            fellow_lower, frozenset(map(sys.intern, fellow_lower.split())),
+            frozenset(alias_substrs), alias_substrs,
+        )
+    return index
+
+
+def _build_lookup_index(fellow_index: Dict[str, FellowEntry]) -> LookupIndex:
+    """
+    Invert fellow_index so exact alias hits and "Last, First" token matches are dict lookups.
+    Fellow-name equality is covered by the token index (equal names have equal token sets).
+    """
+    exact_alias: Dict[str, Tuple[str, ...]] = {}
+    token_index: Dict[FrozenSet[str], Tuple[str, ...]] = {}
+    for fellow, entry in fellow_index.items():
+        for alias in entry.alias_substrs:
+            owners = exact_alias.get(alias, ())
+            if fellow not in owners:
+                exact_alias[alias] = owners + (fellow,)
+        if entry.fellow_lower:
+            parts = entry.parts_fellow
+            token_index[parts] = token_index.get(parts, ()) + (fellow,)
+    return exact_alias, token_index
+
+
+def _alias_hits(email_n: str, dn_lower: str, lookup: LookupIndex) -> Set[str]:
+    """
+    All fellows hit by an exact alias or a name-token match for an already-normalized
+    sender. Independent of the session's candidates.
+    """
+    exact_alias, token_index = lookup
+    hits = set(exact_alias.get(email_n, ()))
+    hits.update(exact_alias.get(dn_lower, ()))
+    hits.update(token_index.get(frozenset(dn_lower.replace(",", " ").split()), ()))
+    return hits
 
 
 def sender_matches_fellow(
-    email: str,
-    display_name: str,
-    fellow_name: str,
-    fellow_aliases: List[str],
+    email_n: str,
+    dn_lower: str,
+    entry: FellowEntry,
+    regex_cache: Optional[Dict[Tuple[str, ...], Pattern[str]]] = None,
 ) -> bool:
     """
-    Return True if (email, display_name) should be counted as this fellow.
-    - Match if email or display_name is in fellow_aliases (from fellows.yaml).
-    - Fallback: fellow_name appears in display_name or display_name in fellow_name (normalized).
+    Return True if the sender should be counted as this fellow.
+    email_n is the lowercased, stripped email and dn_lower the _normalize_name'd display name;
+    callers normalize once per sender rather than once per candidate fellow.
+    entry is the fellow's FellowEntry from _build_fellow_index; regex_cache, if given, holds
+    compiled alias regexes across calls (see _alias_regex).
+    - Match if email or display_name is in the fellow's aliases (from fellows.yaml).
+    - Fallback: fellow_name appears in display_name or display_name in fellow_name (normalized,
+      not glued to other letters: "Allison Lin" is not Allison Li), or all of fellow_name's
+      tokens appear in display_name ("Liu, Jerry").
     """
-    email = email.lower().strip()
-    display_name = display_name.strip()
-    fellow_lower = _normalize_name(fellow_name)
-    dn_lower = _normalize_name(display_name)
+    fellow_lower, parts_fellow, alias_exact, alias_substrs = entry
 
-    for alias in fellow_aliases:
-        alias = alias.strip().lower()
-        if alias in (email, dn_lower):
-            return True
-        if email and alias in email:
-            return True
-        if dn_lower and alias in dn_lower:
+    if alias_substrs:
+        if email_n in alias_exact or dn_lower in alias_exact:
             return True
+        # No alias fits in a haystack shorter than the shortest alias. One search covers
+        # both fields; aliases never contain NUL, so no hit can straddle them.
+        if max(len(email_n), len(dn_lower)) >= len(alias_substrs[0]):
+            regex = _alias_regex(alias_substrs, {} if regex_cache is None else regex_cache)
+            if regex.search(email_n + "\x00" + dn_lower):
+                return True
 
     if not fellow_lower or not dn_lower:
         return False
-    if fellow_lower in dn_lower or dn_lower in fellow_lower:
+    # Plain "in" first: most senders contain neither name, so the boundary check rarely runs
+    if fellow_lower in dn_lower and _contains_name(dn_lower, fellow_lower):
+        return True
+    if dn_lower in fellow_lower and _contains_name(fellow_lower, dn_lower):
         return True
     # Last name, First name style: "Liu, Jerry" vs "Jerry Liu"
-    parts_fellow = set(fellow_lower.split())
-    parts_dn = set(dn_lower.replace(",", " ").split())
-    if parts_fellow & parts_dn == parts_fellow:
+    if parts_fellow.issubset(dn_lower.replace(",", " ").split()):
         return True
     return False
 
@@ -51,16 +220,46 @@ def which_fellow(
     email: str,
     display_name: str,
     candidate_fellows: List[str],
-    fellows_map: Dict[str, List[str]],
+    fellow_index: Dict[str, FellowEntry],
+    lookup: Optional[LookupIndex] = None,
+    hits: Optional[Set[str]] = None,
 ) -> Optional[str]:
     """
     If (email, display_name) matches one of candidate_fellows, return that fellow's name; else None.
+    fellow_index comes from _build_fellow_index and must cover every candidate.
+    Candidates are tried in order and the first one that matches in any way (alias or name) wins.
+    Only if none matches is a given-name typo accepted ("Jery Liu"), and only when exactly
+    one candidate fits.
+    With lookup (from _build_lookup_index), a candidate found by the exact alias/name dict
+    probes is accepted without running its per-fellow substring scan.
+    hits, if given, is the sender's precomputed _alias_hits for that lookup.
     """
+    email_n = email.lower().strip()
+    dn_lower = _normalize_name(display_name)
+    if hits is None:
+        hits = set()
+        if lookup is not None:
+            hits = _alias_hits(email_n, dn_lower, lookup)
+    return _first_matching_fellow(email_n, dn_lower, candidate_fellows, fellow_index, hits, {})
+
+
+def _first_matching_fellow(
+    email_n: str,
+    dn_lower: str,
+    candidate_fellows: List[str],
+    fellow_index: Dict[str, FellowEntry],
+    hits: Set[str],
+    regex_cache: Dict[Tuple[str, ...], Pattern[str]],
+) -> Optional[str]:
+    """which_fellow for an already-normalized sender and its precomputed hits."""
     for fellow in candidate_fellows:
-        aliases = fellows_map.get(fellow, [])
-        if sender_matches_fellow(email, display_name, fellow, aliases):
+        if fellow in hits or sender_matches_fellow(email_n, dn_lower, fellow_index[fellow], regex_cache):
             return fellow
-    return None
+    typo_matches = [
+        fellow for fellow in candidate_fellows
+        if _is_given_name_typo(fellow_index[fellow].fellow_lower, dn_lower)
+    ]
+    return typo_matches[0] if len(typo_matches) == 1 else None
 
 
 def mark_present(
@@ -74,19 +273,52 @@ def mark_present(
     Returns list of (date, day_name, session_index, time, fellow, status, matched_email)
     with status 'present' or 'absent'; matched_email is the sender email when present, None when absent.
     """
-    from datetime import date
+    # Only fellows scheduled in this range can be matched, so only they are indexed
+    fellow_index = _build_fellow_index(
+        fellows_map, (f for entry in expected_list for f in entry[4])
+    )
+    lookup = _build_lookup_index(fellow_index)
+    # Alias regexes compiled on first use during this call
+    regex_cache: Dict[Tuple[str, ...], Pattern[str]] = {}
+    # One batch pass normalizes and resolves index hits for every distinct sender across all dates
+    sender_info: Dict[Tuple[str, str], Tuple[str, str, Set[str]]] = {}
+    for senders in senders_by_date.values():
+        for sender in senders:
+            if sender not in sender_info:
+                email_n = sender[0].lower().strip()
+                dn_lower = _normalize_name(sender[1])
+                sender_info[sender] = (email_n, dn_lower, _alias_hits(email_n, dn_lower, lookup))
+    # (email, display_name, candidate fellows) -> matched fellow; senders repeat across dates
+    sender_cache: Dict[Tuple[str, str, Tuple[str, ...]], Optional[str]] = {}
+    # date -> distinct (email, display_name) pairs in first-seen order
+    unique_senders: Dict[Any, List[Tuple[str, str]]] = {}
     report = []
     for (d, day_name, session_idx, time_slot, fellows) in expected_list:
-        senders = senders_by_date.get(d, [])
+        senders = unique_senders.get(d)
+        if senders is None:
+            senders = unique_senders[d] = list(dict.fromkeys(senders_by_date.get(d, [])))
+        candidates = tuple(fellows)
         matched = {}  # fellow -> email (one email per fellow for display)
         for (email, display_name) in senders:
-            fellow = which_fellow(email, display_name, fellows, fellows_map)
+            key = (email, display_name, candidates)
+            if key in sender_cache:
+                fellow = sender_cache[key]
+            else:
+                email_n, dn_lower, hits = sender_info[(email, display_name)]
+                fellow = _first_matching_fellow(
+                    email_n, dn_lower, fellows, fellow_index, hits, regex_cache
+                )
+                sender_cache[key] = fellow
             if fellow and fellow not in matched:
                 matched[fellow] = email
         for fellow in fellows:
-            status = "present" if fellow in matched else "absent"
+            matched_email = matched.get(fellow, _MISSING)
+            if matched_email is _MISSING:
+                status, matched_email = _ABSENT, None
+            else:
+                status = _PRESENT
             report.append((
                 d, day_name, session_idx, time_slot, fellow, status,
-                matched.get(fellow),
+                matched_email,
             ))
     return report
@@ -0,0 +1,91 @@
+"""Tests for matching: which sender counts as which fellow in mark_present."""
+
+from __future__ import annotations
+
+import pytest
+
+from matching import mark_present
+
+D = "2025-02-16"
+
+
+def _status(fellows_map, candidates, senders):
+    """Return {fellow: (status, matched_email)} for one session on D."""
+    report = mark_present([(D, "sunday", 0, "7:30-8:30", candidates)], {D: senders}, fellows_map)
+    return {row[4]: (row[5], row[6]) for row in report}
+
+
+def test_alias_substring_marks_present():
+    result = _status({"Jerry Liu": ["jliu"]}, ["Jerry Liu"], [("JLiu-26@peddie.org", "")])
+    assert result == {"Jerry Liu": ("present", "JLiu-26@peddie.org")}
+
+
+def test_last_first_display_name():
+    result = _status({}, ["Jerry Liu"], [("someone@gmail.com", "Liu, Jerry")])
+    assert result == {"Jerry Liu": ("present", "someone@gmail.com")}
+
+
+def test_earlier_candidate_wins_over_later_alias_hit():
+    fellows_map = {"Jerry Liu": ["jliu"], "Jerry Yao": ["jyao-26@peddie.org"]}
+    result = _status(fellows_map, ["Jerry Yao", "Jerry Liu"], [("jliu-26@peddie.org", "Jerry")])
+    assert result == {
+        "Jerry Yao": ("present", "jliu-26@peddie.org"),
+        "Jerry Liu": ("absent", None),
+    }
+
+
+def test_earlier_candidate_wins_over_later_exact_alias():
+    fellows_map = {"Jerry Liu": ["jerry"], "Jerry Yao": []}
+    result = _status(fellows_map, ["Jerry Yao", "Jerry Liu"], [("someone@gmail.com", "Jerry")])
+    assert result == {
+        "Jerry Yao": ("present", "someone@gmail.com"),
+        "Jerry Liu": ("absent", None),
+    }
+
+
+def test_empty_alias_matches_nobody():
+    result = _status({"Jerry Liu": [""]}, ["Jerry Liu"], [("a@b.c", "Some Teacher")])
+    assert result == {"Jerry Liu": ("absent", None)}
+
+
+def test_duplicate_senders_keep_first_email():
+    senders = [
+        ("jliu-26@peddie.org", "Jerry Liu"),
+        ("jliu-26@peddie.org", "Jerry Liu"),
+        ("other@gmail.com", "Jerry Liu"),
+    ]
+    result = _status({"Jerry Liu": ["jliu-26@peddie.org"]}, ["Jerry Liu"], senders)
+    assert result == {"Jerry Liu": ("present", "jliu-26@peddie.org")}
+
+
+@pytest.mark.parametrize("display_name", ["Jerry Liu-26", "Jerry Liu.", "Dr.Jerry Liu", "Jerry"])
+def test_name_with_punctuation_marks_present(display_name):
+    result = _status({}, ["Jerry Liu"], [("someone@gmail.com", display_name)])
+    assert result == {"Jerry Liu": ("present", "someone@gmail.com")}
+
+
+def test_given_name_typo_marks_present():
+    result = _status({}, ["Jerry Liu"], [("someone@gmail.com", "Jery Liu")])
+    assert result == {"Jerry Liu": ("present", "someone@gmail.com")}
+
+
+@pytest.mark.parametrize("fellow, sender", [
+    ("Olivia Lu", ("oliu-28@peddie.org", "Olivia Liu")),
+    ("Jerry Liu", ("jlu-28@peddie.org", "Jerry Lu")),
+    ("Allison Li", ("alin-28@peddie.org", "Allison Lin")),
+    ("Ian Chen", ("bchen-28@peddie.org", "Brian Chen")),
+])
+def test_name_near_miss_is_not_the_fellow(fellow, sender):
+    fellows_map = {"Olivia Lu": ["olu-27@peddie.org"], "Jerry Liu": ["jliu-26@peddie.org"],
+                   "Allison Li": ["allisonli-27@peddie.org"]}
+    assert _status(fellows_map, [fellow], [sender]) == {fellow: ("absent", None)}
+
+
+def test_ambiguous_given_name_typo_matches_nobody():
+    result = _status({}, ["Jerry Liu", "Kerry Liu"], [("someone@gmail.com", "Terry Liu")])
+    assert result == {"Jerry Liu": ("absent", None), "Kerry Liu": ("absent", None)}
+
+
+def test_blank_schedule_name_is_absent():
+    result = _status({}, [" "], [("someone@gmail.com", "Jerry Liu")])
+    assert result == {" ": ("absent", None)}